@@ -28,6 +28,11 @@ DATASET_SPLIT = {
     "test": 0.1,
 }
 
+# Hardlink processed files to the raw downloads instead of copying them.
+# Saves disk space, but the two trees then share inodes, so anything that
+# rewrites a processed file (e.g. YOLO fixing a corrupt JPEG) alters raw/ too.
+DATASET_HARDLINK = False
+
 # Firebase settings
 FIREBASE_BUCKET = "dataset-collection-c967a.appspot.com"
 FIREBASE_PREFIX = "yolo_1/"
@@ -1,10 +1,12 @@
 import os
-import random
 import shutil
+import hashlib
+import functools
 import logging
+import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
-from config.config_settings import DOWNLOAD_DIR, PROCESSED_DIR, DATASET_SPLIT
+from config.config_settings import DOWNLOAD_DIR, PROCESSED_DIR, DATASET_SPLIT, DATASET_HARDLINK
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,82 @@ FIXED_CATEGORIES = [
     "strawberry", "chilli", "wildsalat", "onion"
 ]
 
+# Buffer size for the userspace copy fallback
+COPY_BUFSIZE = 256 * 1024
+
+# File placement is I/O-bound, so oversubscribe the CPU count
+MAX_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def _hash_fraction(name: str) -> float:
+    """
+    Map a filename to a stable pseudo-random number in [0, 1).
+    
+    Args:
+        name: Filename to hash
+        
+    Returns:
+        float: Hash-derived fraction
+    """
+    digest = hashlib.blake2b(name.encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big") / 2**32
+
+def _copy_bytes(src: Path, dst: Path):
+    """
+    Copy file contents, letting the kernel do the work where possible.
+    
+    Args:
+        src: Source file path
+        dst: Destination file path
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if hasattr(os, "copy_file_range"):
+            # Kernel-side copy; reflinks on CoW filesystems (btrfs, XFS)
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+            # Restart from scratch with a plain copy
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFSIZE)
+
+def _fast_clone(src: Path, dst: Path, hardlink: bool = False):
+    """
+    Place a file at the destination without a userspace copy where possible.
+    
+    By default the file is copied with copy_file_range, which reflinks on
+    CoW filesystems, so the destination is always an independent file.
+    With hardlink=True the destination is hardlinked instead, aliasing the
+    source: changes to either file show up in both. Falls back to a copy
+    when a hardlink is not possible (e.g. across filesystems).
+    
+    Args:
+        src: Source file path
+        dst: Destination file path
+        hardlink: Hardlink instead of copying
+    """
+    # Replace any file left over from a previous run
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    _copy_bytes(src, dst)
+
 class DatasetOrganizer:
     """Organizer for dataset preprocessing and organization."""
     
@@ -22,6 +100,7 @@ class DatasetOrganizer:
         self.source_path = DOWNLOAD_DIR
         self.output_path = PROCESSED_DIR
         self.split_ratios = DATASET_SPLIT
+        self.hardlink = DATASET_HARDLINK
     
     def create_directories(self):
         """Create target directories for dataset splits."""
@@ -40,37 +119,60 @@ class DatasetOrganizer:
         """
         category_path = self.source_path / category
         label_path = category_path / "labels"
+        dst_images = self.output_path / split / "images"
+        dst_labels = self.output_path / split / "labels"
         
+        # List labels once instead of probing for each image
+        try:
+            with os.scandir(label_path) as it:
+                labels = {e.name for e in it if e.is_file()}
+        except FileNotFoundError:
+            labels = set()
+        
+        srcs = []
+        dsts = []
         for file in files:
-            # Copy image
-            shutil.copy(
-                category_path / file, 
-                self.output_path / split / "images" / file
-            )
+            # Image
+            srcs.append(category_path / file)
+            dsts.append(dst_images / file)
             
-            # Copy label if exists
-            label_file = label_path / file.replace(".jpg", ".txt")
-            if label_file.exists():
-                shutil.copy(
-                    label_file, 
-                    self.output_path / split / "labels" / file.replace(".jpg", ".txt")
-                )
+            # Label if exists (files are already filtered on ".jpg")
+            txt = file[:-4] + ".txt"
+            if txt in labels:
+                srcs.append(label_path / txt)
+                dsts.append(dst_labels / txt)
+        
+        # Place files concurrently; draining the results re-raises
+        # the first failed placement
+        clone = functools.partial(_fast_clone, hardlink=self.hardlink)
+        with ThreadPoolExecutor(max_workers=MAX_IO_WORKERS) as executor:
+            for _ in executor.map(clone, srcs, dsts):
+                pass
     
-    def get_split_counts(self, total: int) -> Dict[str, int]:
+    def assign_split(self, filename: str) -> str:
         """
-        Calculate number of files for each split.
+        Assign a file to a split based on a stable hash of its name.
+        
+        The assignment does not depend on enumeration order or on the other
+        files present, so new files never move existing ones between splits.
+        The trade-off is that the split ratios only hold in expectation and
+        categories are not stratified: a small category may end up with no
+        files in some split.
         
         Args:
-            total: Total number of files
+            filename: Image filename
             
         Returns:
-            Dict with count for each split
+            str: Split name (e.g., 'train')
         """
-        return {
-            'train': int(total * self.split_ratios['train']),
-            'val': int(total * self.split_ratios['val']),
-            'test': int(total * self.split_ratios['test'])
-        }
+        h = _hash_fraction(filename)
+        cumulative = 0.0
+        for split, ratio in self.split_ratios.items():
+            cumulative += ratio
+            if h < cumulative:
+                return split
+        # Float rounding in the ratios: fall back to the last split
+        return split
     
     def organize_dataset(self):
         """
@@ -83,45 +185,30 @@ class DatasetOrganizer:
             self.create_directories()
             
             # Get class folders (feldsalat, strawberry, etc.)
-            categories = [d for d in os.listdir(self.source_path) 
-                         if (self.source_path / d).is_dir()]
+            with os.scandir(self.source_path) as it:
+                categories = [e.name for e in it if e.is_dir() and e.name != 'labels']
             
             if not categories:
                 logger.warning("No category directories found in source path")
                 return False
             
-            # Process each category
             for category in categories:
                 category_path = self.source_path / category
                 
-                # Skip if not a directory or if 'labels' is the only directory
-                if not category_path.is_dir() or category == 'labels':
-                    continue
+                # Stream image filenames straight into their splits
+                split_files = {split: [] for split in self.split_ratios}
+                with os.scandir(category_path) as it:
+                    for e in it:
+                        if e.is_file() and e.name.endswith(".jpg"):
+                            split_files[self.assign_split(e.name)].append(e.name)
                 
-                # Get image filenames
-                image_files = [f for f in os.listdir(category_path) if f.endswith(".jpg")]
-                if not image_files:
+                if not any(split_files.values()):
                     logger.warning(f"No images found in category: {category}")
                     continue
                 
-                # Shuffle files for random split
-                random.shuffle(image_files)
-                
-                # Calculate split sizes
-                counts = self.get_split_counts(len(image_files))
-                
-                # Split dataset
-                start_idx = 0
-                split_files = {}
-                
-                for split, count in counts.items():
-                    end_idx = start_idx + count
-                    split_files[split] = image_files[start_idx:end_idx]
-                    start_idx = end_idx
-                
-                # Add any remaining files to test split
-                if start_idx < len(image_files):
-                    split_files['test'].extend(image_files[start_idx:])
+                for split, files in split_files.items():
+                    if not files:
+                        logger.warning(f"No images assigned to {split} split in category: {category}")
                 
                 # Move files to respective folders
                 for split, files in split_files.items():
@@ -145,7 +232,8 @@ class DatasetOrganizer:
             categories: List of category names
         """
         # Ensure that categories are in the fixed order
-        categories_in_order = [category for category in FIXED_CATEGORIES if category in categories]
+        available = set(categories)
+        categories_in_order = [category for category in FIXED_CATEGORIES if category in available]
         
         # Number of categories that are actually present in the dataset
         # Keep the fixed number of categories (10)
@@ -153,13 +241,19 @@ class DatasetOrganizer:
         
         yaml_path = self.output_path / "data.yaml"
         
-        with open(yaml_path, 'w') as f:
-            f.write(f"# YOLOv8 dataset configuration\n")
-            f.write(f"path: {self.output_path}\n")
-            f.write(f"train: train/images\n")
-            f.write(f"val: val/images\n")
-            f.write(f"test: test/images\n\n")
-            f.write(f"nc: {nc}\n")  # Always 10 categories
-            f.write(f"names: {FIXED_CATEGORIES}\n")  # List all categories in fixed order
+        config = {
+            "path": str(self.output_path),
+            "train": "train/images",
+            "val": "val/images",
+            "test": "test/images",
+            "nc": nc,  # Always 10 categories
+            "names": FIXED_CATEGORIES,  # List all categories in fixed order
+        }
+        
+        # Serialize with a YAML dumper rather than Python reprs, and write once
+        content = "# YOLOv8 dataset configuration\n" + yaml.safe_dump(
+            config, sort_keys=False, default_flow_style=None
+        )
+        yaml_path.write_text(content)
         
         logger.info(f"Created data.yaml file at {yaml_path}")
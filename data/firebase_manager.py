@@ -1,27 +1,78 @@
 """Firebase manager for handling Firebase Storage operations."""
 
 import os
+import time
+import functools
 import logging
-from typing import Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 import firebase_admin
 from firebase_admin import credentials, storage
-from config.config_settings import FIREBASE_BUCKET, FIREBASE_PREFIX, DOWNLOAD_DIR
+from google.cloud.storage import Blob
+from config.config_settings import FIREBASE_BUCKET, FIREBASE_PREFIX, DOWNLOAD_DIR, MONITOR_INTERVAL
 
 logger = logging.getLogger(__name__)
 
+# Downloads are network-bound, so run several at once; capped at the
+# storage client's default HTTP connection pool size (10) so every worker
+# reuses a pooled connection instead of opening a new TLS session
+MAX_DOWNLOAD_WORKERS = 10
+
+# Largest page size accepted by the GCS list API
+LIST_PAGE_SIZE = 1000
+
+# Blob metadata requested when listing
+LIST_FIELDS = "items(name,size,md5Hash),nextPageToken"
+
+def _download_one(blob, local_file_path: str):
+    """
+    Download a single blob to a local path.
+    
+    Args:
+        blob: Firebase Storage blob
+        local_file_path: Destination path on disk
+    """
+    # Ensure the folder structure exists
+    os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
+    
+    blob.download_to_filename(local_file_path)
+    logger.info(f"Downloaded: {blob.name} → {local_file_path}")
+
+def _iter_files(root: str) -> Iterator[str]:
+    """
+    Recursively yield paths of all files below a directory.
+    
+    Uses os.scandir so file types come from the directory entries
+    rather than an extra stat call per entry.
+    
+    Args:
+        root: Directory to walk
+        
+    Yields:
+        str: Path of each file
+    """
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_files(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+    except FileNotFoundError:
+        return
+
 class FirebaseManager:
     """Manager for Firebase Storage operations."""
     
     def __init__(self):
         """Initialize Firebase manager with credentials from environment."""
-        self.bucket = None
-        self.initialized = False
+        self._blob_cache: Optional[List] = None
+        self._blob_cache_time = 0.0
+        self._existing_cache: Optional[Set[str]] = None
     
-    def initialize(self):
-        """Initialize Firebase application if not already initialized."""
-        if self.initialized:
-            return
-        
+    @functools.cached_property
+    def bucket(self):
+        """Firebase Storage bucket, initializing the Firebase app on first access."""
         try:
             cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
             if not cred_path:
@@ -29,7 +80,7 @@ class FirebaseManager:
             
             # Check if Firebase app is already initialized
             try:
-                app = firebase_admin.get_app()
+                firebase_admin.get_app()
             except ValueError:
                 # Initialize new app if not exists
                 cred = credentials.Certificate(cred_path)
@@ -37,9 +88,9 @@ class FirebaseManager:
                     'storageBucket': FIREBASE_BUCKET
                 })
             
-            self.bucket = storage.bucket()
-            self.initialized = True
+            bucket = storage.bucket()
             logger.info("Firebase initialized successfully")
+            return bucket
         except Exception as e:
             logger.error(f"Failed to initialize Firebase: {e}")
             raise
@@ -48,68 +99,119 @@ class FirebaseManager:
         """
         Get set of existing local file paths relative to download directory.
         
+        The download directory is scanned on first use only; afterwards the
+        result is kept up to date by download_new_files.
+        
         Returns:
             Set[str]: Set of relative file paths
         """
-        existing_files = set()
-        download_path = DOWNLOAD_DIR
+        if self._existing_cache is None:
+            download_path = str(DOWNLOAD_DIR)
+            prefix_len = len(download_path) + len(os.sep)
+            
+            # Strip the known root and ensure cross-platform compatibility
+            self._existing_cache = {path[prefix_len:].replace("\\", "/") 
+                                    for path in _iter_files(download_path)}
+        
+        return set(self._existing_cache)
+    
+    def invalidate_existing_cache(self):
+        """Force the next get_existing_files call to rescan the download directory."""
+        self._existing_cache = None
+    
+    def list_remote_blobs(self) -> List:
+        """
+        List blobs in Firebase Storage with the specified prefix.
         
-        for root, _, files in os.walk(download_path):
-            for file in files:
-                relative_path = os.path.relpath(os.path.join(root, file), download_path)
-                # Ensure cross-platform compatibility
-                existing_files.add(relative_path.replace("\\", "/"))
+        The listing is cached for MONITOR_INTERVAL seconds so that callers
+        within the same monitor cycle share a single round of list RPCs.
         
-        return existing_files
+        Returns:
+            List: Blobs under the Firebase prefix
+        """
+        now = time.monotonic()
+        if self._blob_cache is not None and now - self._blob_cache_time < MONITOR_INTERVAL:
+            return self._blob_cache
+        
+        # Filter by prefix server-side instead of listing the whole bucket,
+        # using the largest page size and only the metadata we need
+        self._blob_cache = list(self.bucket.list_blobs(
+            prefix=FIREBASE_PREFIX,
+            page_size=LIST_PAGE_SIZE,
+            fields=LIST_FIELDS,
+        ))
+        self._blob_cache_time = now
+        return self._blob_cache
     
-    def get_firebase_files(self) -> Set[str]:
+    def get_firebase_files(self, blobs: Optional[List] = None) -> Set[str]:
         """
         Get set of all files in Firebase Storage with the specified prefix.
         
+        Args:
+            blobs: Pre-fetched blob listing (optional)
+        
         Returns:
             Set[str]: Set of file paths in Firebase
         """
-        self.initialize()
-        blobs = [blob.name.replace(FIREBASE_PREFIX, "", 1) 
-                for blob in self.bucket.list_blobs() 
-                if blob.name.startswith(FIREBASE_PREFIX)]
-        return set(blobs)
+        if blobs is None:
+            blobs = self.list_remote_blobs()
+        prefix_len = len(FIREBASE_PREFIX)
+        return {blob.name[prefix_len:] for blob in blobs}
     
-    def download_new_files(self) -> Tuple[int, Set[str]]:
+    def diff_remote(self, existing: Set[str], blobs: Optional[List] = None) -> Tuple[Set[str], Dict[str, Blob]]:
+        """
+        Compare the remote listing against local files in a single pass.
+        
+        Args:
+            existing: Set of local file paths relative to download directory
+            blobs: Pre-fetched blob listing (optional)
+            
+        Returns:
+            Tuple[Set[str], Dict[str, Blob]]: Set of new file paths and
+            all remote blobs keyed by relative path
+        """
+        if blobs is None:
+            blobs = self.list_remote_blobs()
+        
+        prefix_len = len(FIREBASE_PREFIX)
+        remote_blobs = {blob.name[prefix_len:]: blob for blob in blobs}
+        new_files = remote_blobs.keys() - existing
+        return new_files, remote_blobs
+    
+    def download_new_files(self, new_files: Optional[Set[str]] = None, 
+                           remote_blobs: Optional[Dict[str, Blob]] = None) -> Tuple[int, Set[str]]:
         """
         Download only new files from Firebase.
         
+        Args:
+            new_files: Pre-computed set of new file paths (optional)
+            remote_blobs: Remote blobs keyed by relative path (optional)
+        
         Returns:
             Tuple[int, Set[str]]: Number of new files downloaded and set of new file paths
         """
-        self.initialize()
-        existing_files = self.get_existing_files()
+        if new_files is None or remote_blobs is None:
+            new_files, remote_blobs = self.diff_remote(self.get_existing_files())
+        
+        pending_blobs = [remote_blobs[path] for path in new_files]
+        local_paths = [os.path.join(DOWNLOAD_DIR, path) for path in new_files]
         
-        # List and filter only files with the specified prefix
-        blobs = [blob for blob in self.bucket.list_blobs() 
-                if blob.name.startswith(FIREBASE_PREFIX)]
+        # Download new files concurrently; draining the results
+        # re-raises the first failed download
+        if pending_blobs:
+            try:
+                with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+                    for _ in executor.map(_download_one, pending_blobs, local_paths):
+                        pass
+            except Exception:
+                # Some downloads may have finished; rescan rather than guess
+                self.invalidate_existing_cache()
+                raise
         
-        new_files_downloaded = 0
-        new_files = set()
+        new_files_downloaded = len(pending_blobs)
         
-        # Download only new files
-        for blob in blobs:
-            relative_blob_path = blob.name.replace(FIREBASE_PREFIX, "", 1)
-            local_file_path = os.path.join(DOWNLOAD_DIR, relative_blob_path)
-            
-            # Check if file already exists
-            if relative_blob_path in existing_files:
-                logger.debug(f"Skipping (Already Exists): {blob.name}")
-                continue
-            
-            # Ensure the folder structure exists
-            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-            
-            # Download the file
-            blob.download_to_filename(local_file_path)
-            logger.info(f"Downloaded: {blob.name} → {local_file_path}")
-            new_files_downloaded += 1
-            new_files.add(relative_blob_path)
+        if self._existing_cache is not None:
+            self._existing_cache.update(new_files)
         
         if new_files_downloaded == 0:
             logger.info("No new files found. Dataset is already up-to-date!")
@@ -1,9 +1,10 @@
 """YOLO model manager for training, prediction, and export operations."""
 
 import os
-import subprocess
+import shutil
 import logging
 import torch
+from ultralytics import YOLO
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Union
@@ -34,27 +35,29 @@ class YOLOManager:
         self.runs_dir = DATA_DIR / "runs"
         self.export_dir = DATA_DIR / "exported_models"
         
+        # In-process model, reused across predict and export
+        self.model: Optional[YOLO] = None
+        self.model_path: Optional[Path] = None
+        
         # Create directories
         self.export_dir.mkdir(parents=True, exist_ok=True)
     
-    def run_command(self, command: str) -> bool:
+    def load_model(self, weights: Union[str, Path]) -> YOLO:
         """
-        Execute a command as a subprocess.
+        Load model weights, reusing the loaded model if the weights are unchanged.
         
         Args:
-            command: Command to run
+            weights: Path or name of the model weights
             
         Returns:
-            bool: True if successful, False otherwise
+            YOLO: Loaded model
         """
-        try:
-            logger.info(f"Running command: {command}")
-            subprocess.run(command, shell=True, check=True)
-            logger.info(f"Command successful: {command}")
-            return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Command failed: {e}")
-            return False
+        weights = Path(weights)
+        if self.model is None or self.model_path != weights:
+            logger.info(f"Loading model: {weights}")
+            self.model = YOLO(str(weights), task=self.task)
+            self.model_path = weights
+        return self.model
     
     def train(self) -> bool:
         """
@@ -67,16 +70,28 @@ class YOLOManager:
             logger.error(f"Data YAML file not found: {self.data_yaml}")
             return False
         
-        train_command = (
-            f"yolo task={self.task} mode=train "
-            f"model={self.model_name} "
-            f"data={self.data_yaml} "
-            f"epochs={self.epochs} batch={self.batch_size} imgsz={self.img_size} device={self.device} "
-            f"project={self.runs_dir} name=train exist_ok=True"
-        )
-        
         logger.info("Starting model training...")
-        return self.run_command(train_command)
+        try:
+            self.load_model(self.model_name).train(
+                data=str(self.data_yaml),
+                epochs=self.epochs,
+                batch=self.batch_size,
+                imgsz=self.img_size,
+                device=self.device,
+                project=str(self.runs_dir),
+                name="train",
+                exist_ok=True,
+            )
+        except Exception as e:
+            logger.error(f"Training failed: {e}")
+            return False
+        finally:
+            # Training rewrites best.pt, so drop the cached model
+            self.model = None
+            self.model_path = None
+        
+        logger.info("Training successful")
+        return True
     
     def predict(self, image_path: Union[str, Path]) -> bool:
         """
@@ -98,15 +113,21 @@ class YOLOManager:
             logger.error(f"Image not found: {image_path}")
             return False
         
-        predict_command = (
-            f"yolo task={self.task} mode=predict "
-            f"model={model_path} "
-            f"source={image_path} "
-            f"project={DATA_DIR / 'predictions'} name=predict exist_ok=True"
-        )
-        
         logger.info(f"Starting prediction on image {image_path}...")
-        return self.run_command(predict_command)
+        try:
+            self.load_model(model_path).predict(
+                source=str(image_path),
+                project=str(DATA_DIR / "predictions"),
+                name="predict",
+                exist_ok=True,
+                save=True,
+            )
+        except Exception as e:
+            logger.error(f"Prediction failed: {e}")
+            return False
+        
+        logger.info("Prediction successful")
+        return True
     
     def export(self, format: str = "torchscript") -> Optional[Path]:
         """
@@ -128,29 +149,40 @@ class YOLOManager:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         export_path = self.export_dir / f"yolov8_best_{timestamp}.{format}"
         
-        export_command = (
-            f"yolo export model={model_path} format={format} imgsz={self.img_size}"
-        )
-        
         logger.info(f"Exporting model to {format} format...")
-        success = self.run_command(export_command)
-        
-        if not success:
+        try:
+            self.load_model(model_path).export(format=format, imgsz=self.img_size)
+        except Exception as e:
+            logger.error(f"Export failed: {e}")
             return None
         
         # Dynamically find the exported model path
         exported_model_dir = self.runs_dir / "train" / "weights"
-        exported_model_files = list(exported_model_dir.glob(f"*.{format}"))
-        
-        if not exported_model_files:
+        suffix = f".{format}"
+        exported_model_path = None
+        latest_ctime = None
+        
+        # Take the most recent exported file in a single directory pass
+        with os.scandir(exported_model_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(suffix):
+                    continue
+                ctime = entry.stat().st_ctime
+                if latest_ctime is None or ctime > latest_ctime:
+                    exported_model_path = entry.path
+                    latest_ctime = ctime
+        
+        if exported_model_path is None:
             logger.error(f"No exported model found in {exported_model_dir}")
             return None
         
-        # Take the most recent exported file
-        exported_model_path = max(exported_model_files, key=os.path.getctime)
-        
-        # Move the exported model to the desired directory with a timestamped name
-        os.rename(exported_model_path, export_path)
+        # Move the exported model to the desired directory with a timestamped name;
+        # shutil.move also works when the two directories are on different filesystems
+        try:
+            shutil.move(exported_model_path, str(export_path))
+        except OSError as e:
+            logger.error(f"Failed to move exported model: {e}")
+            return None
         logger.info(f"Model saved to {export_path}")
         
         return export_path
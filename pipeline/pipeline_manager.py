@@ -3,7 +3,8 @@
 import time
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Set
+from google.cloud.storage import Blob
 from data.firebase_manager import FirebaseManager
 from data.dataset_organizer import DatasetOrganizer
 from models.yolo_manager import YOLOManager
@@ -22,12 +23,15 @@ class PipelineManager:
         self.yolo_manager = YOLOManager()
         self.count_file = DATA_DIR / "last_file_count.txt"
     
-    def run_pipeline(self, test_image: Optional[Path] = None) -> bool:
+    def run_pipeline(self, test_image: Optional[Path] = None, new_files: Optional[Set[str]] = None,
+                     remote_blobs: Optional[Dict[str, Blob]] = None) -> bool:
         """
         Run the complete pipeline: fetch, organize, train, predict, export.
         
         Args:
             test_image: Path to test image for prediction (optional)
+            new_files: Pre-computed set of new file paths (optional)
+            remote_blobs: Remote blobs keyed by relative path (optional)
             
         Returns:
             bool: True if pipeline successful, False otherwise
@@ -36,7 +40,7 @@ class PipelineManager:
         
         # Step 1: Fetch new data from Firebase
         logger.info("Step 1: Fetching data from Firebase")
-        new_files_count, _ = self.firebase_manager.download_new_files()
+        new_files_count, _ = self.firebase_manager.download_new_files(new_files, remote_blobs)
 
         print(new_files_count)
         
@@ -86,11 +90,10 @@ class PipelineManager:
         
         while True:
             try:
+                # Diff Firebase against local files once per cycle and
+                # share the result with the pipeline
                 existing_files = self.firebase_manager.get_existing_files()
-                firebase_files = self.firebase_manager.get_firebase_files()
-                
-                # Calculate number of new files
-                new_files = firebase_files - existing_files
+                new_files, remote_blobs = self.firebase_manager.diff_remote(existing_files)
                 new_file_count = len(new_files)
                 
                 logger.info(f"Checking for new files... Found {new_file_count} new files.")
@@ -101,11 +104,11 @@ class PipelineManager:
                 # Trigger pipeline if threshold reached
                 if new_file_count >= MIN_NEW_FILES_THRESHOLD:
                     logger.info(f"New files threshold reached. Triggering pipeline...")
-                    success = self.run_pipeline()
+                    success = self.run_pipeline(new_files=new_files, remote_blobs=remote_blobs)
                     
                     if success:
                         # Update file count after processing
-                        write_file_count(self.count_file, len(firebase_files))
+                        write_file_count(self.count_file, len(remote_blobs))
                 
                 # Wait before checking again
                 time.sleep(MONITOR_INTERVAL)
@@ -7,6 +7,22 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+def write_text_atomic(file_path: Path, text: str):
+    """
+    Write text to a file atomically.
+    
+    The text is written to a temporary file that then replaces the target,
+    so a crash mid-write never leaves a truncated file behind.
+    
+    Args:
+        file_path: Path to write
+        text: Text to write
+    """
+    os.makedirs(file_path.parent, exist_ok=True)
+    tmp_path = file_path.with_suffix(".tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, file_path)
+
 def get_file_count(file_path: Path) -> int:
     """
     Get file count from a file.
@@ -31,9 +47,7 @@ def write_file_count(file_path: Path, count: int):
         file_path: Path to write count
         count: Count to write
     """
-    os.makedirs(file_path.parent, exist_ok=True)
-    with open(file_path, "w") as f:
-        f.write(str(count))
+    write_text_atomic(file_path, str(count))
     logger.debug(f"Updated file count to {count} in {file_path}")
 
 def find_test_image() -> Optional[Path]: